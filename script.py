@@ -2,9 +2,21 @@ import os
 import sys
 import json
 import time
+import asyncio
 import logging
-from threading import Thread
-from web3 import Web3
+import queue
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock, Thread
+import orjson
+import requests
+import zstandard as zstd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from hexbytes import HexBytes
+from pybloomfilter import BloomFilter
+from web3 import AsyncWeb3, Web3
+from web3.providers.websocket import WebsocketProviderV2
 from web3.exceptions import BadFunctionCallOutput, ContractLogicError
 from requests.exceptions import ConnectionError, Timeout
 from dotenv import load_dotenv
@@ -22,6 +34,7 @@ logging.basicConfig(
 # --- MOCK DATA (for simulation purposes) ---
 # In a real-world scenario, these would be loaded from a config file or environment
 MOCK_SOURCE_CHAIN_RPC = os.getenv('SOURCE_CHAIN_RPC', 'https://rpc.sepolia.org')
+MOCK_SOURCE_CHAIN_WS = os.getenv('SOURCE_CHAIN_WS')  # e.g. wss://... enables push-based subscriptions
 MOCK_DEST_CHAIN_RPC = os.getenv('DEST_CHAIN_RPC', 'https://rpc.goerli.mudit.blog/')
 
 MOCK_SOURCE_BRIDGE_ADDRESS = '0xFab46E002Bad9b095d91C9F4d44934FB9522561d' # A known contract for demo
@@ -29,7 +42,8 @@ MOCK_DEST_BRIDGE_ADDRESS = '0x2a2734269116285E622104597314285957448C85'
 
 # Simplified ABI for the event we are interested in.
 # This prevents needing the full, large ABI for the simulation.
-BRIDGE_ABI = json.dumps([
+# Kept as a parsed list so web3 never has to re-parse a JSON string.
+BRIDGE_ABI = [
     {
         "anonymous": False,
         "inputs": [
@@ -54,59 +68,291 @@ BRIDGE_ABI = json.dumps([
         "stateMutability": "nonpayable",
         "type": "function"
     }
-])
+]
+
+# Frame magic bytes identifying a zstd-compressed snapshot; plain JSON
+# snapshots from older versions are still readable.
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# Maximum block-range size for which per-block header blooms are fetched to
+# pre-filter eth_getLogs. Beyond this, one range query is cheaper than the headers.
+HEADER_PREFILTER_MAX_BLOCKS = 64
+
+# Ceiling for the adaptive eth_getLogs chunk size. Chunks grow towards this
+# on success and are halved when the node times out or rejects the query.
+MAX_SCAN_BATCH_SIZE = 5000
+
+
+class LazyHex:
+    """
+    Defers hex-encoding of a bytes value until a log record is formatted.
+
+    Passed as a logging argument, str() — and therefore the .hex() work —
+    only runs if a handler actually emits the record.
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return '0x' + bytes(self.value).hex()
+
+
+def block_may_contain_log(logs_bloom: str, *items: bytes) -> bool:
+    """
+    Checks a block header's logsBloom for the given items (address, topics).
+
+    Ethereum sets three bits per logged address/topic in the 2048-bit header
+    bloom. If any of the bits for an item is unset, no log in that block can
+    contain the item, so an eth_getLogs call for it can be skipped entirely.
+
+    Args:
+        logs_bloom (str): The hex-encoded logsBloom field from a block header.
+        *items (bytes): Raw address (20 bytes) or topic (32 bytes) values.
+
+    Returns:
+        bool: False only if the block definitely contains no matching log.
+    """
+    bloom = bytes.fromhex(logs_bloom[2:] if logs_bloom.startswith('0x') else logs_bloom)
+    for item in items:
+        digest = Web3.keccak(item)
+        for i in (0, 2, 4):
+            bit_index = ((digest[i] << 8) | digest[i + 1]) & 2047
+            if not (bloom[255 - bit_index // 8] >> (bit_index % 8)) & 1:
+                return False
+    return True
+
 
 class StateDB:
-    """A simple file-based JSON database to persist the state of processed transactions."""
+    """
+    A simple file-based database to persist the state of processed transactions.
+
+    Writes go to an append-only log (one hex hash per line) so that marking a
+    transaction costs a single small append instead of rewriting the whole
+    set. The log is periodically folded into a zstd-compressed snapshot by
+    compact(); on startup, the snapshot is loaded and the log replayed on top.
+
+    Hashes are kept in memory as raw 32-byte values — hex strings exist only
+    at the file and logging boundaries — and membership is pre-screened by a
+    memory-mapped bloom filter that persists across restarts.
+    """
 
-    def __init__(self, db_path: str = 'processed_txs.json'):
+    def __init__(self, db_path: str = 'processed_txs.json', compact_every: int = 1000,
+                 flush_interval: float = 10.0):
         """
         Initializes the StateDB.
 
         Args:
-            db_path (str): The path to the JSON file used for storage.
+            db_path (str): The path to the snapshot file used for storage.
+            compact_every (int): Number of inserts between automatic compactions.
+            flush_interval (float): Seconds the background flusher waits while
+                                    coalescing log appends.
         """
         self.db_path = db_path
+        self.log_path = db_path + '.log'
+        self.bloom_path = db_path + '.bloom'
+        self.meta_path = db_path + '.meta'
+        self._meta = self._load_meta()
+        self.compact_every = compact_every
+        self._inserts_since_compact = 0
+        # Guards the set and bloom filter; events may be marked concurrently
+        # from several relay worker threads.
+        self._lock = Lock()
         self.processed_tx_hashes = self._load_state()
-        logging.info(f"StateDB initialized. Loaded {len(self.processed_tx_hashes)} processed transactions from '{self.db_path}'.")
-
-    def _load_state(self) -> set:
-        """Loads the set of processed transaction hashes from the file."""
-        if not os.path.exists(self.db_path):
-            return set()
+        # Bloom filter fronting the set: the overwhelming majority of lookups
+        # are negative, and those are answered here by a constant-time bit
+        # check. The filter is memory-mapped to disk, so restarts reopen it
+        # instead of rebuilding it from the full set.
+        if os.path.exists(self.bloom_path):
+            self._bloom = BloomFilter.open(self.bloom_path)
+        else:
+            self._bloom = BloomFilter(1_000_000, 1e-4, self.bloom_path)
+            for tx_hash in self.processed_tx_hashes:
+                self._bloom.add(tx_hash)
+        self._log = open(self.log_path, 'ab', buffering=0)
+        # Disk writes happen on a dedicated flusher thread so that marking a
+        # transaction only touches in-memory structures and a queue; the
+        # flusher coalesces everything queued within flush_interval into one
+        # log append.
+        self.flush_interval = flush_interval
+        self._write_q = queue.Queue()
+        self._flusher_thread = Thread(target=self._flusher, name='StateDBFlusher', daemon=True)
+        self._flusher_thread.start()
+        logging.info("StateDB initialized. Loaded %s processed transactions from '%s'.", len(self.processed_tx_hashes), self.db_path)
+
+    @staticmethod
+    def _to_bytes(tx_hash) -> bytes:
+        """Normalizes a transaction hash (hex string or bytes-like) to raw bytes."""
+        if isinstance(tx_hash, str):
+            return bytes.fromhex(tx_hash[2:] if tx_hash.startswith('0x') else tx_hash)
+        return bytes(tx_hash)
+
+    def _load_meta(self) -> dict:
+        """Loads the sidecar metadata file (relayer checkpoints and the like)."""
+        if not os.path.exists(self.meta_path):
+            return {}
         try:
-            with open(self.db_path, 'r') as f:
-                tx_hashes = json.load(f)
-                return set(tx_hashes)
+            with open(self.meta_path, 'r') as f:
+                return json.load(f)
         except (IOError, json.JSONDecodeError) as e:
-            logging.error(f"Could not load state from {self.db_path}: {e}")
-            return set()
+            logging.error("Could not load metadata from %s: %s", self.meta_path, e)
+            return {}
+
+    def get_meta(self, key: str, default=None):
+        """Returns a persisted metadata value, or the default if unset."""
+        return self._meta.get(key, default)
+
+    def set_meta(self, key: str, value):
+        """
+        Persists a metadata value.
+
+        The metadata file is tiny, so it is rewritten atomically on every
+        update (temp file plus os.replace) rather than logged.
+
+        Args:
+            key (str): The metadata key, e.g. 'last_scanned_block'.
+            value: Any JSON-serializable value.
+        """
+        self._meta[key] = value
+        tmp_path = self.meta_path + '.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self._meta, f)
+            os.replace(tmp_path, self.meta_path)
+        except IOError as e:
+            logging.error("Could not save metadata to %s: %s", self.meta_path, e)
+
+    def _load_state(self) -> set:
+        """Loads the snapshot of processed transaction hashes and replays the log."""
+        tx_hashes = set()
+        if os.path.exists(self.db_path):
+            try:
+                with open(self.db_path, 'rb') as f:
+                    payload = f.read()
+                if payload.startswith(ZSTD_MAGIC):
+                    # stream_writer emits frames without a content size in the
+                    # header, which the one-shot decompress() refuses; the
+                    # streaming decompressor handles them.
+                    payload = zstd.ZstdDecompressor().decompressobj().decompress(payload)
+                if payload.lstrip()[:1] == b'[':
+                    # Legacy JSON-array snapshot.
+                    tx_hashes = {self._to_bytes(h) for h in orjson.loads(payload)}
+                else:
+                    tx_hashes = {self._to_bytes(line.decode()) for line in payload.splitlines() if line}
+            except (IOError, ValueError, zstd.ZstdError) as e:
+                logging.error("Could not load state from %s: %s", self.db_path, e)
+        if os.path.exists(self.log_path):
+            try:
+                with open(self.log_path, 'r') as f:
+                    tx_hashes.update(self._to_bytes(line.strip()) for line in f if line.strip())
+            except (IOError, ValueError) as e:
+                logging.error("Could not replay log from %s: %s", self.log_path, e)
+        return tx_hashes
 
     def _save_state(self):
-        """Saves the current set of processed transaction hashes to the file."""
+        """Saves the current set of processed transaction hashes as a snapshot.
+
+        The snapshot is zstd-compressed newline-delimited hex, the same
+        format as the log. Entries are streamed straight from the set into
+        the compressor, so no transient list or JSON buffer of the whole set
+        is materialized during the save. The file is written to a temporary
+        path and moved into place so a crash mid-write cannot corrupt the
+        previous snapshot.
+        """
+        tmp_path = self.db_path + '.tmp'
+        # A shallow copy taken under the lock keeps the iteration safe
+        # against concurrent inserts without holding the lock during I/O.
+        with self._lock:
+            entries = tuple(self.processed_tx_hashes)
         try:
-            with open(self.db_path, 'w') as f:
-                json.dump(list(self.processed_tx_hashes), f, indent=2)
+            with open(tmp_path, 'wb') as f:
+                with zstd.ZstdCompressor(level=3).stream_writer(f) as writer:
+                    for h in entries:
+                        writer.write(b'0x' + h.hex().encode() + b'\n')
+            os.replace(tmp_path, self.db_path)
         except IOError as e:
-            logging.error(f"Could not save state to {self.db_path}: {e}")
+            logging.error("Could not save state to %s: %s", self.db_path, e)
 
-    def is_processed(self, tx_hash: str) -> bool:
-        """Checks if a given transaction hash has already been processed."""
-        return tx_hash in self.processed_tx_hashes
+    def compact(self):
+        """Folds the append-only log into the snapshot and truncates the log."""
+        self._save_state()
+        self._log.truncate(0)
+        self._log.seek(0)
+        self._inserts_since_compact = 0
+        logging.info("StateDB compacted. Snapshot now holds %s transactions.", len(self.processed_tx_hashes))
 
-    def mark_as_processed(self, tx_hash: str):
+    def _flusher(self):
+        """Drains the write queue in flush_interval windows and appends to the log."""
+        while True:
+            try:
+                item = self._write_q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            stop = item is None
+            pending = [] if stop else [item]
+            while True:
+                try:
+                    item = self._write_q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    pending.append(item)
+            if pending:
+                self._flush(pending)
+            if stop:
+                return
+
+    def _flush(self, pending: list):
+        """Appends a batch of raw hashes to the log, compacting when due."""
+        try:
+            self._log.write(b''.join(b'0x' + h.hex().encode() + b'\n' for h in pending))
+        except IOError as e:
+            logging.error("Could not append to log %s: %s", self.log_path, e)
+            return
+        self._inserts_since_compact += len(pending)
+        if self._inserts_since_compact >= self.compact_every:
+            self.compact()
+
+    def close(self):
+        """Flushes pending writes, compacts the database and closes the log."""
+        self._write_q.put(None)
+        self._flusher_thread.join()
+        self.compact()
+        self._bloom.sync()
+        self._log.close()
+
+    def is_processed(self, tx_hash) -> bool:
+        """Checks if a given transaction hash has already been processed."""
+        raw = self._to_bytes(tx_hash)
+        with self._lock:
+            if raw not in self._bloom:
+                return False
+            # Bloom hits can be false positives, so confirm against the set.
+            return raw in self.processed_tx_hashes
+
+    def mark_as_processed(self, tx_hash):
         """
-        Marks a transaction hash as processed and saves the state.
+        Marks a transaction hash as processed and queues it for the log.
+
+        Only the in-memory set, the bloom filter and a queue are touched
+        here; the actual disk append is done by the flusher thread.
 
         Args:
-            tx_hash (str): The transaction hash (hex string) to mark.
+            tx_hash: The transaction hash (hex string or bytes-like) to mark.
         """
-        if tx_hash in self.processed_tx_hashes:
-            logging.warning(f"Attempted to mark already processed transaction: {tx_hash}")
-            return
-        self.processed_tx_hashes.add(tx_hash)
-        self._save_state()
-        logging.info(f"Marked transaction as processed: {tx_hash}")
+        raw = self._to_bytes(tx_hash)
+        with self._lock:
+            if raw in self.processed_tx_hashes:
+                logging.warning("Attempted to mark already processed transaction: %s", LazyHex(raw))
+                return
+            self.processed_tx_hashes.add(raw)
+            self._bloom.add(raw)
+        self._write_q.put(raw)
+        logging.info("Marked transaction as processed: %s", LazyHex(raw))
 
 
 class BlockchainConnector:
@@ -126,44 +372,122 @@ class BlockchainConnector:
         self.rpc_url = rpc_url
         self.chain_name = chain_name
         self.web3 = None
+        self._contract_cache = {}
+        self._session = None
         self.connect()
 
     def connect(self):
         """Establishes a connection to the RPC endpoint and verifies it."""
         try:
-            self.web3 = Web3(Web3.HTTPProvider(self.rpc_url, request_kwargs={'timeout': 60}))
+            if self.rpc_url.startswith(('ws://', 'wss://')):
+                self.web3 = Web3(Web3.WebsocketProvider(self.rpc_url, websocket_timeout=60))
+            else:
+                # One keep-alive session with a tuned connection pool is
+                # shared between web3 and batch_request, so polls reuse an
+                # established TCP/TLS connection instead of handshaking anew.
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16,
+                                      max_retries=Retry(total=3, backoff_factor=0.5))
+                self._session.mount('https://', adapter)
+                self._session.mount('http://', adapter)
+                self.web3 = Web3(Web3.HTTPProvider(self.rpc_url, request_kwargs={'timeout': 60},
+                                                   session=self._session))
             if self.web3.is_connected():
-                logging.info(f"Successfully connected to {self.chain_name} at {self.rpc_url}")
+                logging.info("Successfully connected to %s at %s", self.chain_name, self.rpc_url)
             else:
                 raise ConnectionError("Web3 provider failed to connect.")
         except (ConnectionError, Timeout) as e:
-            logging.error(f"Failed to connect to {self.chain_name}: {e}")
+            logging.error("Failed to connect to %s: %s", self.chain_name, e)
             self.web3 = None
 
     def get_latest_block(self) -> int:
         """Fetches the latest block number from the connected chain."""
         if not self.web3:
-            logging.error(f"Cannot get latest block. Not connected to {self.chain_name}.")
+            logging.error("Cannot get latest block. Not connected to %s.", self.chain_name)
             return 0
         try:
             return self.web3.eth.block_number
         except Exception as e:
-            logging.error(f"Error fetching latest block from {self.chain_name}: {e}")
+            logging.error("Error fetching latest block from %s: %s", self.chain_name, e)
             return 0
 
-    def get_contract_event_filter(self, address: str, abi: str, event_name: str, from_block: int, to_block: int):
-        """Creates a filter for a specific contract event over a block range."""
+    def get_contract(self, address: str, abi: list):
+        """
+        Returns a cached Contract object for the given address.
+
+        Binding a contract parses the ABI and checksums the address, which is
+        wasteful to repeat on every poll; the bound object is cached keyed by
+        address and reused for the lifetime of the connector.
+
+        Args:
+            address (str): The contract address.
+            abi (list): The parsed contract ABI.
+
+        Returns:
+            The web3 Contract object, or None if not connected.
+        """
         if not self.web3:
-            logging.error("Cannot create event filter. Not connected.")
+            logging.error("Cannot bind contract. Not connected to %s.", self.chain_name)
             return None
-        try:
+        contract = self._contract_cache.get(address)
+        if contract is None:
             contract = self.web3.eth.contract(address=Web3.to_checksum_address(address), abi=abi)
-            event = getattr(contract.events, event_name)
-            return event.create_filter(fromBlock=from_block, toBlock=to_block)
-        except Exception as e:
-            logging.error(f"Error creating event filter for {event_name} on {self.chain_name}: {e}")
+            self._contract_cache[address] = contract
+        return contract
+
+    def batch_request(self, calls: list) -> list:
+        """
+        Sends several JSON-RPC calls to the node in a single HTTP request.
+
+        web3.py does not expose JSON-RPC batching, so the batch envelope is
+        hand-crafted and posted directly to the RPC endpoint. This collapses
+        N sequential round trips into one.
+
+        Args:
+            calls (list): A list of (method, params) tuples, e.g.
+                          [('eth_blockNumber', []), ('eth_getLogs', [{...}])].
+
+        Returns:
+            list: The results in the same order as the calls, with None in the
+                  place of any call the node answered with an error. Returns
+                  None entirely if the HTTP request itself failed.
+        """
+        if not self.web3:
+            logging.error("Cannot send batch request. Not connected to %s.", self.chain_name)
             return None
 
+        batch = [
+            {'jsonrpc': '2.0', 'id': i, 'method': method, 'params': params}
+            for i, (method, params) in enumerate(calls)
+        ]
+        try:
+            post = self._session.post if self._session else requests.post
+            response = post(self.rpc_url, json=batch, timeout=60)
+            response.raise_for_status()
+            payload = response.json()
+        except (ConnectionError, Timeout, requests.HTTPError, ValueError) as e:
+            logging.error("Batch request to %s failed: %s", self.chain_name, e)
+            return None
+
+        if not isinstance(payload, list):
+            # Some nodes answer a malformed or oversized batch with a single
+            # error object instead of a response array.
+            logging.error("Batch request to %s rejected by node: %s", self.chain_name, payload)
+            return None
+
+        responses_by_id = {item.get('id'): item for item in payload}
+
+        results = []
+        for i, (method, _) in enumerate(calls):
+            item = responses_by_id.get(i)
+            if item is None or 'error' in item:
+                error = item['error'] if item else 'no response'
+                logging.error("Batched call '%s' failed on %s: %s", method, self.chain_name, error)
+                results.append(None)
+            else:
+                results.append(item['result'])
+        return results
+
 class BridgeRelayer:
     """
     The main orchestrator for the cross-chain bridge event listener.
@@ -188,12 +512,64 @@ class BridgeRelayer:
         self.dest_contract_address = dest_config['bridge_address']
         self.contract_abi = source_config['abi']
         self.event_to_watch = source_config['event_name']
-        
+
+        # Pre-compute the checksum address and event signature hash once;
+        # every eth_getLogs query reuses them instead of re-deriving both
+        # from the ABI on each scan.
+        self.source_checksum_address = Web3.to_checksum_address(self.source_contract_address)
+        event_abi = next(
+            item for item in self.contract_abi
+            if item.get('type') == 'event' and item.get('name') == self.event_to_watch
+        )
+        event_signature = f"{self.event_to_watch}({','.join(inp['type'] for inp in event_abi['inputs'])})"
+        self._topic0 = Web3.keccak(text=event_signature).hex()
+        # Raw-byte forms of the identifiers, for bloom probing and equality
+        # checks; hex strings only appear at the RPC and logging boundaries.
+        self._topic0_bytes = bytes.fromhex(self._topic0[2:])
+        self._source_address_bytes = bytes.fromhex(self.source_checksum_address[2:])
+
+        self.source_ws_rpc = source_config.get('ws_rpc')
+        # When enabled, bloom-positive blocks are fetched via
+        # eth_getBlockReceipts (Geth/Erigon) and filtered in-process, which
+        # also yields the full receipt of every matching transaction.
+        self.use_block_receipts = source_config.get('use_block_receipts', False)
         self.state_db = state_db
         self.block_confirmations = block_confirmations
         self.poll_interval = poll_interval
-        self.last_scanned_block = source_config.get('start_block', self.source_connector.get_latest_block())
+        # Resume from the persisted checkpoint when one exists; falling back
+        # to start_block after a restart would re-scan everything since then,
+        # and falling back to the head would silently skip events.
+        resume_block = state_db.get_meta('last_scanned_block')
+        if resume_block is not None:
+            self.last_scanned_block = resume_block
+            logging.info("Resuming scan from persisted checkpoint at block %s.", resume_block)
+        else:
+            self.last_scanned_block = source_config.get('start_block', self.source_connector.get_latest_block())
         self.is_running = False
+        self._stop_event = Event()
+        # Event loop and task behind the WebSocket mode, kept so stop() can
+        # cancel a subscription that is idle waiting for the next message.
+        self._ws_loop = None
+        self._ws_task = None
+        # Head of the source chain as seen by the previous poll. Each poll
+        # batches its eth_getLogs scan with a fresh eth_blockNumber, so the
+        # scan range is always based on the head from one poll earlier.
+        self.known_head = None
+        # Adaptive chunk size for log scans: halved when the node times out
+        # or rejects a query, doubled (up to MAX_SCAN_BATCH_SIZE) on success.
+        self._batch_size = source_config.get('scan_batch_size', 500)
+        # Independent events are relayed in parallel; a real relay blocks on
+        # signing and the destination-chain receipt, so one inflight
+        # transaction at a time would cap throughput at one event per block.
+        self._executor = ThreadPoolExecutor(
+            max_workers=source_config.get('relay_workers', 8),
+            thread_name_prefix='RelayWorker'
+        )
+        # Destination-chain nonce assignment must stay strictly serial even
+        # though relays run in parallel. A real implementation would seed the
+        # counter from eth_getTransactionCount for the relayer account.
+        self._nonce_lock = Lock()
+        self._next_dest_nonce = 0
 
     def start(self):
         """Starts the relayer's main event processing loop in a separate thread."""
@@ -202,7 +578,11 @@ class BridgeRelayer:
             return
 
         self.is_running = True
-        self.thread = Thread(target=self._run_loop, name="RelayerLoop")
+        self._stop_event.clear()
+        # Prefer push-based delivery over polling when a WebSocket endpoint
+        # is configured; the node then notifies us of matching logs directly.
+        loop_target = self._run_subscription if self.source_ws_rpc else self._run_loop
+        self.thread = Thread(target=loop_target, name="RelayerLoop")
         self.thread.daemon = True
         self.thread.start()
         logging.info("Bridge Relayer has been started.")
@@ -210,8 +590,16 @@ class BridgeRelayer:
     def stop(self):
         """Stops the relayer's main loop gracefully."""
         self.is_running = False
+        self._stop_event.set()
+        # The subscription loop may be blocked waiting for the next message;
+        # cancel its task so the join below cannot hang until an event
+        # happens to arrive.
+        if self._ws_task is not None and not self._ws_loop.is_closed():
+            self._ws_loop.call_soon_threadsafe(self._ws_task.cancel)
         if self.thread.is_alive():
             self.thread.join()
+        self._executor.shutdown(wait=True)
+        self.state_db.close()
         logging.info("Bridge Relayer has been stopped.")
 
     def _run_loop(self):
@@ -220,75 +608,298 @@ class BridgeRelayer:
             try:
                 self._process_source_events()
             except Exception as e:
-                logging.error(f"An unexpected error occurred in the main loop: {e}")
+                logging.error("An unexpected error occurred in the main loop: %s", e)
             
-            logging.info(f"Waiting for {self.poll_interval} seconds before next poll.")
-            time.sleep(self.poll_interval)
+            logging.info("Waiting for %s seconds before next poll.", self.poll_interval)
+            # Event.wait returns immediately once stop() sets the event, so
+            # shutdown is not delayed by up to a full poll interval.
+            self._stop_event.wait(self.poll_interval)
+
+    @staticmethod
+    def _extract_subscription_result(message):
+        """
+        Unwraps an eth_subscription notification into its log payload.
+
+        listen_to_websocket may yield either the full JSON-RPC notification
+        or the already-unwrapped result depending on message type; anything
+        that is not a log payload is dropped.
+        """
+        if not isinstance(message, dict):
+            return None
+        if 'params' in message:
+            return message['params'].get('result')
+        if 'result' in message:
+            return message['result']
+        return message
+
+    def _run_subscription(self):
+        """Entry point for the push-based event loop thread."""
+        self._ws_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._ws_loop)
+        self._ws_task = self._ws_loop.create_task(self._subscribe_loop())
+        try:
+            self._ws_loop.run_until_complete(self._ws_task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._ws_loop.close()
+
+    async def _subscribe_loop(self):
+        """
+        Receives bridge events pushed by the source node over WebSocket.
+
+        Instead of re-issuing eth_getLogs every poll_interval regardless of
+        whether a new block arrived, this opens an eth_subscribe("logs")
+        subscription so the node delivers matching logs as they are mined.
+        On (re)connect, the HTTP polling path is used once to backfill any
+        blocks missed while disconnected.
+        """
+        filter_params = self._build_log_filter_params(0, 0)
+        subscription_params = {
+            'address': filter_params['address'],
+            'topics': filter_params['topics']
+        }
+
+        while self.is_running:
+            try:
+                async with AsyncWeb3.persistent_websocket(WebsocketProviderV2(self.source_ws_rpc)) as w3:
+                    logging.info("WebSocket subscription opened at %s", self.source_ws_rpc)
+                    # Backfill the gap between last_scanned_block and head that
+                    # accumulated while no subscription was active. The head is
+                    # seeded first: with known_head unset, _process_source_events
+                    # would only fetch the head and skip the scan entirely.
+                    self.known_head = await w3.eth.block_number
+                    self._process_source_events()
+
+                    await w3.eth.subscribe('logs', subscription_params)
+                    async for message in w3.ws.listen_to_websocket():
+                        raw_log = self._extract_subscription_result(message)
+                        if raw_log is None:
+                            continue
+                        self._handle_event(self._decode_raw_log(raw_log))
+                        block_number = raw_log.get('blockNumber')
+                        if block_number is not None:
+                            self.last_scanned_block = int(block_number, 16) if isinstance(block_number, str) else int(block_number)
+                            self.state_db.set_meta('last_scanned_block', self.last_scanned_block)
+                        if not self.is_running:
+                            break
+            except Exception as e:
+                if not self.is_running:
+                    break
+                logging.error("WebSocket subscription error: %s. Reconnecting in 5 seconds...", e)
+                await asyncio.sleep(5)
+
+    def _build_log_filter_params(self, from_block: int, to_block: int) -> dict:
+        """Builds raw eth_getLogs parameters for the watched contract event."""
+        return {
+            'address': self.source_checksum_address,
+            'topics': [self._topic0],
+            'fromBlock': hex(from_block),
+            'toBlock': hex(to_block)
+        }
+
+    @staticmethod
+    def _normalize_raw_log(raw_log: dict) -> dict:
+        """
+        Applies the formatting web3's own result pipeline would to a raw log.
+
+        Logs fetched through batch_request bypass web3, so their topics, data
+        and hashes arrive as hex strings and their positions as hex numbers;
+        process_log (and downstream code holding the transaction hash)
+        expects HexBytes and ints.
+        """
+        log = dict(raw_log)
+        for key in ('transactionHash', 'blockHash', 'data'):
+            if isinstance(log.get(key), str):
+                log[key] = HexBytes(log[key])
+        if isinstance(log.get('topics'), list):
+            log['topics'] = [HexBytes(t) if isinstance(t, str) else t for t in log['topics']]
+        for key in ('blockNumber', 'transactionIndex', 'logIndex'):
+            if isinstance(log.get(key), str):
+                log[key] = int(log[key], 16)
+        return log
+
+    def _decode_raw_log(self, raw_log: dict):
+        """Decodes a raw eth_getLogs entry into a structured event."""
+        contract = self.source_connector.get_contract(self.source_checksum_address, self.contract_abi)
+        event = getattr(contract.events, self.event_to_watch)
+        return event().process_log(self._normalize_raw_log(raw_log))
 
     def _process_source_events(self):
-        """Scans a range of blocks on the source chain for new bridge events."""
-        latest_block = self.source_connector.get_latest_block()
-        if not latest_block:
-            return
-        
-        # Define the block range to scan, ensuring we respect confirmation depth
+        """
+        Scans a range of blocks on the source chain for new bridge events.
+
+        The range is walked in adaptive chunks of at most `_batch_size`
+        blocks, so a relayer that has fallen far behind never issues one huge
+        eth_getLogs query. Progress is recorded after every successful chunk,
+        and on a timeout or node rejection the chunk size is halved and the
+        same chunk retried; successful chunks grow it back towards
+        MAX_SCAN_BATCH_SIZE. The head lookup rides in the first chunk's
+        JSON-RPC batch (or is fetched alone when there is nothing to scan),
+        and the scan range is derived from the head of the previous poll.
+        """
         from_block = self.last_scanned_block + 1
-        to_block = latest_block - self.block_confirmations
+        to_block = (self.known_head - self.block_confirmations) if self.known_head else 0
 
         if from_block > to_block:
-            logging.info(f"No new blocks to process. Current head: {latest_block}, waiting for confirmations.")
+            if self.known_head:
+                logging.info("No new blocks to process. Current head: %s, waiting for confirmations.", self.known_head)
+            results = self.source_connector.batch_request([('eth_blockNumber', [])])
+            if results and results[0] is not None:
+                self.known_head = int(results[0], 16)
             return
 
-        logging.info(f"Scanning for '{self.event_to_watch}' events from block {from_block} to {to_block}...")
+        logging.info("Scanning for '%s' events from block %s to %s...", self.event_to_watch, from_block, to_block)
+
+        head_refreshed = False
+        chunk_from = from_block
+        while chunk_from <= to_block and self.is_running:
+            chunk_to = min(chunk_from + self._batch_size - 1, to_block)
+            if self._scan_chunk(chunk_from, chunk_to, include_head=not head_refreshed):
+                head_refreshed = True
+                self.last_scanned_block = chunk_to
+                self.state_db.set_meta('last_scanned_block', chunk_to)
+                chunk_from = chunk_to + 1
+                self._batch_size = min(self._batch_size * 2, MAX_SCAN_BATCH_SIZE)
+            else:
+                if self._batch_size == 1:
+                    logging.error("Scan of single block %s failed; giving up until next poll.", chunk_from)
+                    return
+                self._batch_size = max(self._batch_size // 2, 1)
+                logging.warning("Chunk %s-%s failed; retrying with batch size %s.", chunk_from, chunk_to, self._batch_size)
 
-        event_filter = self.source_connector.get_contract_event_filter(
-            self.source_contract_address,
-            self.contract_abi,
-            self.event_to_watch,
-            from_block,
-            to_block
-        )
+    def _scan_chunk(self, from_block: int, to_block: int, include_head: bool = False) -> bool:
+        """
+        Fetches and processes logs for one bounded block range.
 
-        if not event_filter:
-            return
+        For small chunks, block headers are batched in instead of the log
+        query, and their logsBloom fields are tested against the bridge
+        address and event topic: blocks whose bloom cannot contain the event
+        are skipped without ever issuing eth_getLogs.
 
-        try:
-            events = event_filter.get_all_entries()
-            if not events:
-                logging.info(f"No new events found in block range {from_block}-{to_block}.")
+        Args:
+            from_block (int): First block of the chunk (inclusive).
+            to_block (int): Last block of the chunk (inclusive).
+            include_head (bool): Piggyback an eth_blockNumber call on the
+                                 batch to refresh known_head.
+
+        Returns:
+            bool: True if the chunk was scanned successfully.
+        """
+        calls = [('eth_blockNumber', [])] if include_head else []
+        filter_params = self._build_log_filter_params(from_block, to_block)
+        use_prefilter = (to_block - from_block + 1) <= HEADER_PREFILTER_MAX_BLOCKS
+        if use_prefilter:
+            calls.extend(('eth_getBlockByNumber', [hex(b), False]) for b in range(from_block, to_block + 1))
+        else:
+            calls.append(('eth_getLogs', [filter_params]))
+
+        results = self.source_connector.batch_request(calls)
+        if not results:
+            return False
+
+        if include_head:
+            if results[0] is not None:
+                self.known_head = int(results[0], 16)
+            results = results[1:]
+
+        if use_prefilter:
+            headers = results
+            if any(h is None for h in headers):
+                # Missing headers: cannot prove absence, fall back to a scan.
+                log_results = self.source_connector.batch_request([('eth_getLogs', [filter_params])])
+                raw_logs = log_results[0] if log_results else None
             else:
-                logging.info(f"Found {len(events)} new event(s). Processing...")
-                for event in events:
-                    self._handle_event(event)
+                matching_blocks = [
+                    int(h['number'], 16) for h in headers
+                    if block_may_contain_log(h['logsBloom'], self._source_address_bytes, self._topic0_bytes)
+                ]
+                if not matching_blocks:
+                    # Every header bloom excludes the event; nothing to fetch.
+                    raw_logs = []
+                elif self.use_block_receipts:
+                    raw_logs = self._fetch_logs_from_block_receipts(matching_blocks)
+                else:
+                    log_results = self.source_connector.batch_request([('eth_getLogs', [filter_params])])
+                    raw_logs = log_results[0] if log_results else None
+        else:
+            raw_logs = results[0]
+
+        if raw_logs is None:
+            return False
+
+        if not raw_logs:
+            logging.info("No new events found in block range %s-%s.", from_block, to_block)
+        else:
+            logging.info("Found %s new event(s). Processing...", len(raw_logs))
+            # Fan the independent events out over the worker pool; the chunk
+            # only counts as scanned once every handler has finished.
+            list(self._executor.map(self._handle_raw_log, raw_logs))
+        return True
+
+    def _handle_raw_log(self, raw_log: dict):
+        """Decodes and handles one raw log entry; runs on a relay worker thread."""
+        self._handle_event(self._decode_raw_log(raw_log))
+
+    def _fetch_logs_from_block_receipts(self, block_numbers: list) -> list:
+        """
+        Fetches full receipts for whole blocks and filters the logs in-process.
 
-            # Update the last scanned block regardless of whether events were found
-            self.last_scanned_block = to_block
+        eth_getBlockReceipts returns every receipt (with its logs) for a block
+        in one call, so one RPC per block replaces per-event lookups when the
+        receipt context is needed. Only blocks whose header bloom matched the
+        event should be passed in — for sparse events, fetching receipts for
+        every block would be strictly worse than a ranged eth_getLogs.
 
-        except Exception as e:
-            logging.error(f"Error retrieving events from filter: {e}")
+        Args:
+            block_numbers (list): Block numbers to fetch receipts for.
+
+        Returns:
+            list: Raw log entries matching the bridge address and event topic,
+                  or None if any receipt fetch failed.
+        """
+        calls = [('eth_getBlockReceipts', [hex(b)]) for b in block_numbers]
+        results = self.source_connector.batch_request(calls)
+        if not results or any(r is None for r in results):
+            return None
+
+        address_lower = self.source_checksum_address.lower()
+        raw_logs = []
+        for receipts in results:
+            for receipt in receipts:
+                for log in receipt['logs']:
+                    if log['address'].lower() == address_lower and log['topics'][0] == self._topic0:
+                        raw_logs.append(log)
+        return raw_logs
 
     def _handle_event(self, event):
         """
         Processes a single event, validates it, and relays it to the destination chain.
         """
-        tx_hash_hex = event['transactionHash'].hex()
+        # web3 hands us HexBytes; keep the raw bytes all the way through and
+        # only hex-encode where a human-readable string is actually emitted.
+        tx_hash = event['transactionHash']
 
-        if self.state_db.is_processed(tx_hash_hex):
-            logging.warning(f"Skipping already processed event from transaction: {tx_hash_hex}")
+        if self.state_db.is_processed(tx_hash):
+            logging.warning("Skipping already processed event from transaction: %s", LazyHex(tx_hash))
             return
 
         event_args = event['args']
-        logging.info(f"New event detected: TransactionId: {event_args['transactionId'].hex()}, Amount: {event_args['amount']}, To: {event_args['to']}")
+        # One lazy wrapper shared by every log line that mentions the id;
+        # the hex encoding only runs for records that are actually emitted.
+        source_tx_id = LazyHex(event_args['transactionId'])
+        logging.info("New event detected: TransactionId: %s, Amount: %s, To: %s",
+                     source_tx_id, event_args['amount'], event_args['to'])
 
         # --- RELAY LOGIC ---
         # In a real relayer, this would involve building, signing, and sending a transaction.
         # Here, we simulate this action.
-        self._simulate_relay_tx(event_args)
+        self._simulate_relay_tx(event_args, source_tx_id)
 
         # Mark as processed after successful relay simulation
-        self.state_db.mark_as_processed(tx_hash_hex)
+        self.state_db.mark_as_processed(tx_hash)
 
-    def _simulate_relay_tx(self, event_args):
+    def _simulate_relay_tx(self, event_args, source_tx_id: LazyHex):
         """
         Simulates the act of sending a transaction to the destination bridge contract.
         """
@@ -296,10 +907,17 @@ class BridgeRelayer:
             logging.error("Cannot simulate relay transaction. Destination chain not connected.")
             return
 
-        logging.info(f"[SIMULATION] Relaying transaction to destination chain...")
-        logging.info(f"[SIMULATION]   -> Contract: {self.dest_contract_address}")
-        logging.info(f"[SIMULATION]   -> Function: mintTokens")
-        logging.info(f"[SIMULATION]   -> Params: to={event_args['to']}, amount={event_args['amount']}, sourceTxId={event_args['transactionId'].hex()}")
+        # Nonce assignment is the one serial section of a parallel relay:
+        # each destination transaction needs a unique, gapless nonce.
+        with self._nonce_lock:
+            nonce = self._next_dest_nonce
+            self._next_dest_nonce += 1
+
+        logging.info("[SIMULATION] Relaying transaction to destination chain...")
+        logging.info("[SIMULATION]   -> Contract: %s", self.dest_contract_address)
+        logging.info("[SIMULATION]   -> Function: mintTokens")
+        logging.info("[SIMULATION]   -> Params: to=%s, amount=%s, sourceTxId=%s, nonce=%s",
+                     event_args['to'], event_args['amount'], source_tx_id, nonce)
         
         # A real implementation would look something like this:
         # contract = self.dest_connector.web3.eth.contract(address=..., abi=...)
@@ -311,7 +929,7 @@ class BridgeRelayer:
         
         # For this simulation, we just log and assume success.
         time.sleep(1) # Simulate network latency
-        logging.info(f"[SIMULATION] Successfully relayed transaction for source ID: {event_args['transactionId'].hex()}")
+        logging.info("[SIMULATION] Successfully relayed transaction for source ID: %s", source_tx_id)
 
 
 if __name__ == '__main__':
@@ -320,6 +938,7 @@ if __name__ == '__main__':
     # Configuration Dictionaries
     source_chain_config = {
         'rpc': MOCK_SOURCE_CHAIN_RPC,
+        'ws_rpc': MOCK_SOURCE_CHAIN_WS,
         'bridge_address': MOCK_SOURCE_BRIDGE_ADDRESS,
         'abi': BRIDGE_ABI,
         'event_name': 'TokensLocked',
@@ -341,16 +960,19 @@ if __name__ == '__main__':
         poll_interval=30 # Poll every 30 seconds
     )
 
+    # Block the main thread on an event instead of a sleep loop; the signal
+    # handlers wake it immediately, without periodic wake-ups in between.
+    shutdown_event = Event()
+    signal.signal(signal.SIGINT, lambda *_: shutdown_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: shutdown_event.set())
+
     try:
         relayer.start()
-        # Keep the main thread alive to allow the background thread to run
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
+        shutdown_event.wait()
         logging.info("Shutdown signal received. Stopping relayer...")
         relayer.stop()
         logging.info("Relayer stopped. Exiting.")
     except Exception as e:
-        logging.critical(f"A critical error occurred in the main thread: {e}")
+        logging.critical("A critical error occurred in the main thread: %s", e)
         relayer.stop()
 